@@ -1,6 +1,8 @@
 import csv
+import io
 import logging
 import re
+from collections import Counter, defaultdict
 from collections.abc import Callable, Iterable, Iterator
 from contextlib import AbstractContextManager
 from dataclasses import dataclass
@@ -8,6 +10,7 @@ from datetime import datetime, timedelta, timezone
 from functools import cache
 from pathlib import Path
 from types import TracebackType
+from typing import TypeVar
 
 from csvmodel import ascsvdict, fromcsvdict, register_cast
 from overcast import (
@@ -27,15 +30,27 @@ from utils import (
 
 logger = logging.getLogger("db")
 
+T = TypeVar("T")
+
 
 _DATETIME_MAX_TZ_AWARE = datetime.max.replace(tzinfo=timezone.utc)
 
+_PRIVATE_TITLE_NOISE_RES = (
+    re.compile(r" — Private to .+"),
+    re.compile(r"\s*\([^)]*\)\s*"),
+    re.compile(r"\s*\[[^]]*\]\s*"),
+    re.compile(r"\s*:[^:]*$"),
+    re.compile(r"\s*- Patreon Exclusive Feed$"),
+)
+_SLUG_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_SLUG_WHITESPACE_RE = re.compile(r"\s+")
+
 register_cast(OvercastFeedURL, fromstr=OvercastFeedURL)
 register_cast(OvercastEpisodeURL, fromstr=OvercastEpisodeURL)
 register_cast(HTTPURL, fromstr=HTTPURL)
 
 
-@dataclass
+@dataclass(slots=True)
 class Feed:
     id: OvercastFeedItemID
     overcast_url: OvercastFeedURL | None
@@ -59,19 +74,17 @@ class Feed:
     def clean_title(self) -> str:
         if not self.is_private:
             return self.title
-        title = re.sub(r" — Private to .+", "", self.title)
-        title = re.sub(r"\s*\([^)]*\)\s*", "", title)
-        title = re.sub(r"\s*\[[^]]*\]\s*", "", title)
-        title = re.sub(r"\s*:[^:]*$", "", title)
-        title = re.sub(r"\s*- Patreon Exclusive Feed$", "", title)
+        title = self.title
+        for pattern in _PRIVATE_TITLE_NOISE_RES:
+            title = pattern.sub("", title)
         title = title.split(" | ")[0]
         title = title.strip()
         return title
 
     @property
     def slug(self) -> str:
-        title = re.sub(r"[^\w\s]", "", self.clean_title)
-        title = re.sub(r"\s+", "-", title)
+        title = _SLUG_PUNCTUATION_RE.sub("", self.clean_title)
+        title = _SLUG_WHITESPACE_RE.sub("-", title)
         title = title.lower().removesuffix("-")
         return title
 
@@ -111,15 +124,22 @@ class Feed:
 class FeedCollection:
     @staticmethod
     def load(filename: Path) -> "FeedCollection":
-        with filename.open("r") as csvfile:
-            rows = csv.DictReader(csvfile)
-            return FeedCollection(Feed.from_dict(row) for row in rows)
+        with filename.open("r", newline="") as csvfile:
+            data = csvfile.read()
+        rows = csv.DictReader(io.StringIO(data))
+        collection = FeedCollection(Feed.from_dict(row) for row in rows)
+        collection._saved_csv = data
+        return collection
 
     _feeds: list[Feed]
+    _feeds_by_id: dict[OvercastFeedItemID, Feed]
+    _needs_sort: bool = False
+    _saved_csv: str | None = None
     _initial_nonnull_counts: dict[str, int]
 
     def __init__(self, feeds: Iterable[Feed] = []) -> None:
         self._feeds = list(feeds)
+        self._feeds_by_id = {f.id: f for f in self._feeds}
         self._initial_nonnull_counts = self._nonnull_counts()
 
     def _nonnull_counts(self) -> dict[str, int]:
@@ -135,19 +155,24 @@ class FeedCollection:
         return len(self._feeds)
 
     def __iter__(self) -> Iterator[Feed]:
+        if self._needs_sort:
+            self.sort()
         yield from self._feeds
 
     def get(self, feed_id: OvercastFeedItemID) -> Feed | None:
-        for f in self._feeds:
-            if f.id == feed_id:
-                return f
-        return None
+        return self._feeds_by_id.get(feed_id)
 
     def sort(self) -> None:
         self._feeds.sort(key=Feed._sort_key)
+        self._needs_sort = False
+
+    def bulk_set(self, field_name: str, value: bool | None) -> None:
+        assert field_name in Feed.__dataclass_fields__, field_name
+        for feed in self._feeds:
+            setattr(feed, field_name, value)
 
     def save(self, filename: Path) -> None:
-        feeds_lst = list(self._feeds)
+        feeds_lst = list(self)
 
         for field, count in self._nonnull_counts().items():
             assert count >= self._initial_nonnull_counts[field], (
@@ -156,15 +181,23 @@ class FeedCollection:
 
         assert len(set(f.id for f in feeds_lst)) == len(feeds_lst), "Duplicate IDs"
 
-        with filename.open("w") as csvfile:
-            writer = csv.DictWriter(
-                csvfile,
-                fieldnames=Feed.fieldnames(),
-                quoting=csv.QUOTE_MINIMAL,
-            )
-            writer.writeheader()
-            for feed in feeds_lst:
-                writer.writerow(feed.to_dict())
+        csvfile = io.StringIO()
+        writer = csv.DictWriter(
+            csvfile,
+            fieldnames=Feed.fieldnames(),
+            quoting=csv.QUOTE_MINIMAL,
+        )
+        writer.writeheader()
+        for feed in feeds_lst:
+            writer.writerow(feed.to_dict())
+
+        data = csvfile.getvalue()
+        if data == self._saved_csv:
+            logger.debug("%s unchanged", filename)
+            return
+        with filename.open("w", newline="") as f:
+            f.write(data)
+        self._saved_csv = data
 
     def insert_or_update(
         self,
@@ -172,22 +205,19 @@ class FeedCollection:
         on_insert: Callable[[OvercastFeedItemID], Feed],
         on_update: Callable[[Feed], Feed],
     ) -> None:
-        append = True
-
-        for i, f in enumerate(self._feeds):
-            if f.id == feed_id:
-                self._feeds[i] = on_update(f)
-                append = False
-                break
-
-        if append:
+        if (f := self._feeds_by_id.get(feed_id)) is not None:
+            feed = on_update(f)
+            if feed is not f:
+                self._feeds[self._feeds.index(f)] = feed
+        else:
             feed = on_insert(feed_id)
             self._feeds.append(feed)
 
-        self.sort()
+        self._feeds_by_id[feed_id] = feed
+        self._needs_sort = True
 
 
-@dataclass
+@dataclass(slots=True)
 class Episode:
     id: OvercastEpisodeItemID | None
     overcast_url: OvercastEpisodeURL
@@ -235,15 +265,22 @@ class Episode:
 class EpisodeCollection:
     @staticmethod
     def load(filename: Path) -> "EpisodeCollection":
-        with filename.open("r") as csvfile:
-            rows = csv.DictReader(csvfile)
-            return EpisodeCollection(Episode.from_dict(row) for row in rows)
+        with filename.open("r", newline="") as csvfile:
+            data = csvfile.read()
+        rows = csv.DictReader(io.StringIO(data))
+        collection = EpisodeCollection(Episode.from_dict(row) for row in rows)
+        collection._saved_csv = data
+        return collection
 
     _episodes: list[Episode]
+    _episodes_by_url: dict[OvercastEpisodeURL, Episode]
+    _needs_sort: bool = False
+    _saved_csv: str | None = None
     _initial_nonnull_counts: dict[str, int]
 
     def __init__(self, episodes: Iterable[Episode] = []) -> None:
         self._episodes = list(episodes)
+        self._episodes_by_url = {e.overcast_url: e for e in self._episodes}
         self._initial_nonnull_counts = self._nonnull_counts()
 
     def _nonnull_counts(self) -> dict[str, int]:
@@ -261,10 +298,16 @@ class EpisodeCollection:
         return len(self._episodes)
 
     def __iter__(self) -> Iterator[Episode]:
+        if self._needs_sort:
+            self.sort()
         yield from self._episodes
 
+    def get(self, episode_url: OvercastEpisodeURL) -> Episode | None:
+        return self._episodes_by_url.get(episode_url)
+
     def __delitem__(self, episode: Episode) -> None:
         self._episodes.remove(episode)
+        del self._episodes_by_url[episode.overcast_url]
 
     def insert_or_update(
         self,
@@ -272,25 +315,44 @@ class EpisodeCollection:
         on_insert: Callable[[OvercastEpisodeURL], Episode],
         on_update: Callable[[Episode], Episode],
     ) -> None:
-        append = True
-
-        for i, e in enumerate(self._episodes):
-            if e.overcast_url == episode_url:
-                self._episodes[i] = on_update(e)
-                append = False
-                break
-
-        if append:
+        if (e := self._episodes_by_url.get(episode_url)) is not None:
+            episode = on_update(e)
+            if episode is not e:
+                self._episodes[self._episodes.index(e)] = episode
+        else:
             episode = on_insert(episode_url)
             self._episodes.append(episode)
 
-        self.sort()
+        self._episodes_by_url[episode_url] = episode
+        self._needs_sort = True
+
+    def insert_or_update_many(
+        self,
+        items: Iterable[T],
+        episode_url: Callable[[T], OvercastEpisodeURL],
+        on_insert: Callable[[OvercastEpisodeURL, T], Episode],
+        on_update: Callable[[Episode, T], Episode],
+    ) -> None:
+        for item in items:
+            url = episode_url(item)
+            if (e := self._episodes_by_url.get(url)) is not None:
+                episode = on_update(e, item)
+                if episode is not e:
+                    self._episodes[self._episodes.index(e)] = episode
+            else:
+                episode = on_insert(url, item)
+                self._episodes.append(episode)
+
+            self._episodes_by_url[url] = episode
+
+        self._needs_sort = True
 
     def sort(self) -> None:
         self._episodes.sort(key=Episode._sort_key)
+        self._needs_sort = False
 
     def save(self, filename: Path) -> None:
-        episodes_lst = list(self._episodes)
+        episodes_lst = list(self)
 
         for field, count in self._nonnull_counts().items():
             assert count >= self._initial_nonnull_counts[field], (
@@ -301,26 +363,38 @@ class EpisodeCollection:
             "Duplicate Overcast URLs"
         )
 
-        with filename.open("w") as csvfile:
-            writer = csv.DictWriter(
-                csvfile,
-                fieldnames=Episode.fieldnames(),
-                quoting=csv.QUOTE_MINIMAL,
-            )
-            writer.writeheader()
-            for episode in episodes_lst:
-                writer.writerow(episode.to_dict())
+        csvfile = io.StringIO()
+        writer = csv.DictWriter(
+            csvfile,
+            fieldnames=Episode.fieldnames(),
+            quoting=csv.QUOTE_MINIMAL,
+        )
+        writer.writeheader()
+        for episode in episodes_lst:
+            writer.writerow(episode.to_dict())
+
+        data = csvfile.getvalue()
+        if data == self._saved_csv:
+            logger.debug("%s unchanged", filename)
+            return
+        with filename.open("w", newline="") as f:
+            f.write(data)
+        self._saved_csv = data
 
     @property
     def download_counts(self) -> dict[OvercastFeedItemID, int]:
-        counts: dict[OvercastFeedItemID, int] = {}
-        for episode in self._episodes:
-            if episode.is_downloaded:
-                counts[episode.feed_id] = counts.get(episode.feed_id, 0) + 1
-        return counts
+        return Counter(e.feed_id for e in self._episodes if e.is_downloaded)
+
+    def by_feed(self) -> dict[OvercastFeedItemID, list[Episode]]:
+        episodes: defaultdict[OvercastFeedItemID, list[Episode]] = defaultdict(list)
+        for episode in self:
+            episodes[episode.feed_id].append(episode)
+        return episodes
 
 
 class Database(AbstractContextManager["Database"]):
+    __slots__ = ("path", "feeds", "episodes")
+
     path: Path
     feeds: FeedCollection
     episodes: EpisodeCollection
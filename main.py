@@ -1,11 +1,15 @@
+import heapq
 import logging
 import os
 import random
+from collections import Counter, defaultdict
 from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import AbstractContextManager
 from datetime import datetime, timedelta
 from functools import partial
 from itertools import islice
+from operator import attrgetter
 from pathlib import Path
 from types import TracebackType
 
@@ -23,6 +27,8 @@ from db import Database
 
 logger = logging.getLogger("overcast-data")
 
+_MAX_WORKERS = 8
+
 
 def _xdg_cache_home() -> Path:
     if "XDG_CACHE_HOME" in os.environ:
@@ -32,6 +38,8 @@ def _xdg_cache_home() -> Path:
 
 
 class Context(AbstractContextManager["Context"]):
+    __slots__ = ("session", "db")
+
     session: overcast.Session
     db: Database
 
@@ -107,8 +115,7 @@ def refresh_opml_export(ctx: Context) -> None:
         export_data = overcast.export_account_extended_data(session=ctx.session)
 
         # Reset following and use current value from export data
-        for db_feed in ctx.db.feeds:
-            db_feed.is_following = False
+        ctx.db.feeds.bulk_set("is_following", False)
 
         def on_feed_insert(
             feed_id: overcast.OvercastFeedItemID,
@@ -138,13 +145,11 @@ def refresh_opml_export(ctx: Context) -> None:
 
         def on_episode_insert(
             episode_url: overcast.OvercastEpisodeURL,
-            export_feed: overcast.ExtendedExportFeed,
             export_episode: overcast.ExtendedExportEpisode,
+            export_feed: overcast.ExtendedExportFeed,
         ) -> db.Episode:
             assert episode_url == export_episode.overcast_url
-            duration = overcast.fetch_audio_duration(
-                ctx.session, export_episode.enclosure_url
-            )
+            duration = durations[export_episode.enclosure_url]
             return db.Episode(
                 id=export_episode.item_id,
                 overcast_url=episode_url,
@@ -160,8 +165,8 @@ def refresh_opml_export(ctx: Context) -> None:
 
         def on_episode_update(
             db_episode: db.Episode,
-            export_feed: overcast.ExtendedExportFeed,
             export_episode: overcast.ExtendedExportEpisode,
+            export_feed: overcast.ExtendedExportFeed,
         ) -> db.Episode:
             assert db_episode.overcast_url == export_episode.overcast_url
             db_episode.id = export_episode.item_id
@@ -175,6 +180,18 @@ def refresh_opml_export(ctx: Context) -> None:
 
             return db_episode
 
+        # Fetch audio durations for new episodes before inserting them
+        durations = overcast.fetch_audio_durations(
+            ctx.session,
+            (
+                export_episode.enclosure_url
+                for export_feed in export_data.feeds
+                for export_episode in export_feed.episodes
+                if ctx.db.episodes.get(export_episode.overcast_url) is None
+            ),
+            max_workers=_MAX_WORKERS,
+        )
+
         for export_feed in export_data.feeds:
             ctx.db.feeds.insert_or_update(
                 feed_id=export_feed.item_id,
@@ -182,20 +199,12 @@ def refresh_opml_export(ctx: Context) -> None:
                 on_update=partial(on_feed_update, export_feed=export_feed),
             )
 
-            for export_episode in export_feed.episodes:
-                ctx.db.episodes.insert_or_update(
-                    episode_url=export_episode.overcast_url,
-                    on_insert=partial(
-                        on_episode_insert,
-                        export_feed=export_feed,
-                        export_episode=export_episode,
-                    ),
-                    on_update=partial(
-                        on_episode_update,
-                        export_feed=export_feed,
-                        export_episode=export_episode,
-                    ),
-                )
+            ctx.db.episodes.insert_or_update_many(
+                export_feed.episodes,
+                episode_url=lambda export_episode: export_episode.overcast_url,
+                on_insert=partial(on_episode_insert, export_feed=export_feed),
+                on_update=partial(on_episode_update, export_feed=export_feed),
+            )
 
         # If still missing downloaded state, fill with False
         for db_episode in ctx.db.episodes:
@@ -216,8 +225,7 @@ def refresh_feeds_index(ctx: Context) -> None:
         html_feeds = overcast.fetch_podcasts(session=ctx.session)
 
         # Reset is added and use current value from index
-        for db_feed in ctx.db.feeds:
-            db_feed.is_added = False
+        ctx.db.feeds.bulk_set("is_added", False)
 
         def on_feed_insert(
             feed_id: overcast.OvercastFeedItemID,
@@ -252,11 +260,11 @@ def refresh_feeds_index(ctx: Context) -> None:
             )
 
         # Clear download flag on episodes for feeds that don't have any unplayed episodes
+        db_episodes_by_feed = ctx.db.episodes.by_feed()
         for html_feed in html_feeds:
             if html_feed.is_played:
-                for db_episode in ctx.db.episodes:
-                    if db_episode.feed_id == html_feed.item_id:
-                        db_episode.is_downloaded = False
+                for db_episode in db_episodes_by_feed.get(html_feed.item_id, []):
+                    db_episode.is_downloaded = False
 
     except overcast.RatedLimitedError:
         logger.error("Rate limited")
@@ -268,11 +276,17 @@ def refresh_feeds_index(ctx: Context) -> None:
 @click.pass_obj
 def refresh_feeds(ctx: Context, limit: int) -> None:
     logger.info("[refresh-feeds]")
-    for db_feed in islice(_feeds_to_refresh(ctx), limit):
-        _refresh_feed(ctx, db_feed)
 
+    db_feeds = list(islice(_feeds_to_refresh(ctx, limit), limit))
+
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+        html_podcasts = executor.map(partial(_fetch_feed, ctx), db_feeds)
+        for db_feed, html_podcast in zip(db_feeds, html_podcasts):
+            if html_podcast:
+                _refresh_feed(ctx, db_feed, html_podcast)
 
-def _feeds_to_refresh(ctx: Context) -> Iterator[db.Feed]:
+
+def _feeds_to_refresh(ctx: Context, limit: int) -> Iterator[db.Feed]:
     try:
         html_feeds = overcast.fetch_podcasts(session=ctx.session)
     except overcast.RatedLimitedError:
@@ -281,6 +295,7 @@ def _feeds_to_refresh(ctx: Context) -> Iterator[db.Feed]:
 
     feeds = list(_zip_html_db_feeds(html_feeds=html_feeds, db_feeds=ctx.db.feeds))
 
+    out_of_sync_feed_ids: set[overcast.OvercastFeedItemID] = set()
     db_download_counts = ctx.db.episodes.download_counts
     for html_feed, db_feed in feeds:
         db_feed_downloads = db_download_counts.get(db_feed.id, 0)
@@ -292,6 +307,7 @@ def _feeds_to_refresh(ctx: Context) -> Iterator[db.Feed]:
                 db_feed_downloads,
             )
             overcast.expire_podcast(ctx.session, html_feed.overcast_url)
+            out_of_sync_feed_ids.add(db_feed.id)
             yield db_feed
 
     def cache_request_date(feed: tuple[overcast.HTMLPodcastsFeed, db.Feed]) -> datetime:
@@ -300,31 +316,45 @@ def _feeds_to_refresh(ctx: Context) -> Iterator[db.Feed]:
         logger.debug("%s last request date: %s", url, cache_date)
         return cache_date
 
-    for html_feed, db_feed in sorted(feeds, key=cache_request_date):
+    # Expired feeds were already yielded above, don't let them take up the limit
+    feeds = [f for f in feeds if f[1].id not in out_of_sync_feed_ids]
+    for html_feed, db_feed in heapq.nsmallest(limit, feeds, key=cache_request_date):
         yield db_feed
 
 
 def _zip_html_db_feeds(
     html_feeds: Iterable[overcast.HTMLPodcastsFeed],
-    db_feeds: Iterable[db.Feed],
+    db_feeds: db.FeedCollection,
 ) -> Iterator[tuple[overcast.HTMLPodcastsFeed, db.Feed]]:
-    id_to_db_feed = {f.id: f for f in db_feeds}
     for html_feed in html_feeds:
-        db_feed = id_to_db_feed.get(html_feed.item_id)
+        db_feed = db_feeds.get(html_feed.item_id)
         if not db_feed:
             logger.warning("Feed '%s' not found in database", html_feed.item_id)
             continue
         yield html_feed, db_feed
 
 
-def _refresh_feed(ctx: Context, db_feed: db.Feed) -> None:
+def _fetch_feed(ctx: Context, db_feed: db.Feed) -> overcast.HTMLPodcastFeed | None:
     logger.info("Refreshing feed '%s'", db_feed.clean_title)
 
-    feed_id = db_feed.id
     feed_url = db_feed.overcast_url
     if not feed_url:
         logger.warning("Feed '%s' has no Overcast URL", db_feed.id)
-        return
+        return None
+
+    try:
+        return overcast.fetch_podcast(session=ctx.session, feed_url=feed_url)
+    except overcast.RatedLimitedError:
+        logger.error("Rate limited")
+        return None
+
+
+def _refresh_feed(
+    ctx: Context,
+    db_feed: db.Feed,
+    html_podcast: overcast.HTMLPodcastFeed,
+) -> None:
+    feed_id = db_feed.id
 
     def on_episode_insert(
         episode_url: overcast.OvercastEpisodeURL,
@@ -367,18 +397,12 @@ def _refresh_feed(ctx: Context, db_feed: db.Feed) -> None:
 
         return db_episode
 
-    try:
-        html_podcast = overcast.fetch_podcast(session=ctx.session, feed_url=feed_url)
-        for html_episode in html_podcast.episodes:
-            ctx.db.episodes.insert_or_update(
-                episode_url=html_episode.overcast_url,
-                on_insert=partial(on_episode_insert, html_episode=html_episode),
-                on_update=partial(on_episode_update, html_episode=html_episode),
-            )
-
-    except overcast.RatedLimitedError:
-        logger.error("Rate limited")
-        return
+    ctx.db.episodes.insert_or_update_many(
+        html_podcast.episodes,
+        episode_url=lambda html_episode: html_episode.overcast_url,
+        on_insert=on_episode_insert,
+        on_update=on_episode_update,
+    )
 
 
 @cli.command("backfill-episode")
@@ -388,16 +412,25 @@ def _refresh_feed(ctx: Context, db_feed: db.Feed) -> None:
 def backfill_episode(ctx: Context, limit: int, randomize_order: bool) -> None:
     logger.info("[backfill-episode] %s", limit)
 
-    episodes = list(_episodes_missing_optional_info(ctx))
+    # Episodes missing several fields are yielded once per field, dedupe them so
+    # two workers never backfill the same row at once
+    episodes = list({id(e): e for e in _episodes_missing_optional_info(ctx)}.values())
     if randomize_order:
-        random.shuffle(episodes)
+        episodes = random.sample(episodes, k=min(limit, len(episodes)))
+
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+        for _ in executor.map(partial(_backfill_episode, ctx), islice(episodes, limit)):
+            pass
+
 
-    for db_episode in islice(episodes, limit):
-        try:
-            feed_title = "Missing feed"
-            if feed := ctx.db.feeds.get(db_episode.feed_id):
-                feed_title = feed.title
+def _backfill_episode(ctx: Context, db_episode: db.Episode) -> None:
+    try:
+        feed_title = "Missing feed"
+        if feed := ctx.db.feeds.get(db_episode.feed_id):
+            feed_title = feed.title
 
+        # Episode page is only needed for a missing ID or enclosure URL
+        if db_episode.id is None or db_episode.enclosure_url is None:
             html_episode = overcast.fetch_episode(
                 session=ctx.session,
                 episode_url=db_episode.overcast_url,
@@ -409,25 +442,34 @@ def backfill_episode(ctx: Context, limit: int, randomize_order: bool) -> None:
             if db_episode.enclosure_url is None:
                 db_episode.enclosure_url = html_episode.enclosure_url
 
-            if db_episode.duration is None:
-                db_episode.duration = overcast.fetch_audio_duration(
-                    ctx.session, html_episode.enclosure_url
-                )
+        if db_episode.duration is None and db_episode.enclosure_url:
+            db_episode.duration = overcast.fetch_audio_duration(
+                ctx.session, db_episode.enclosure_url
+            )
 
-        except overcast.RatedLimitedError:
-            logger.error("Rate limited")
-            continue
-        except overcast.NotFound:
-            logger.warning("Skipping '%s' '%s'", feed_title, db_episode.title)
-            continue
+    except overcast.RatedLimitedError:
+        logger.error("Rate limited")
+    except overcast.NotFound:
+        logger.warning("Skipping '%s' '%s'", feed_title, db_episode.title)
 
 
 def _episodes_missing_optional_info(ctx: Context) -> Iterator[db.Episode]:
-    episodes = sorted(ctx.db.episodes, key=lambda e: e.date_published, reverse=True)
-
-    db_episodes_missing_duration = [e for e in episodes if e.duration is None]
-    db_episodes_missing_enclosure_url = [e for e in episodes if e.enclosure_url is None]
-    db_episodes_missing_id = [e for e in episodes if e.id is None]
+    db_episodes_missing_duration: list[db.Episode] = []
+    db_episodes_missing_enclosure_url: list[db.Episode] = []
+    db_episodes_missing_id: list[db.Episode] = []
+    for e in ctx.db.episodes:
+        if e.duration is None:
+            db_episodes_missing_duration.append(e)
+        if e.enclosure_url is None:
+            db_episodes_missing_enclosure_url.append(e)
+        if e.id is None:
+            db_episodes_missing_id.append(e)
+
+    # Most recent first, only sort the episodes that need backfilling
+    date_published = attrgetter("date_published")
+    db_episodes_missing_duration.sort(key=date_published, reverse=True)
+    db_episodes_missing_enclosure_url.sort(key=date_published, reverse=True)
+    db_episodes_missing_id.sort(key=date_published, reverse=True)
 
     if db_episodes_missing_duration:
         logger.info(
@@ -482,24 +524,23 @@ def metrics(ctx: Context, metrics_filename: str | None) -> None:
 
     logger.info("[metrics]")
 
+    episode_counts: Counter[tuple[str, str, str, str]] = Counter()
+    episode_minutes: defaultdict[tuple[str, str, str, str], float] = defaultdict(float)
+
     feed_slugs: dict[overcast.OvercastFeedItemID, str] = {}
     for db_feed in ctx.db.feeds:
         feed_slug = db_feed.slug
         feed_slugs[db_feed.id] = feed_slug
 
         for label_combination in label_combinations:
-            overcast_episode_count.labels(
-                feed_slug=feed_slug,
-                played=label_combination["played"],
-                downloaded=label_combination["downloaded"],
-                did_download=label_combination["did_download"],
-            ).set(0)
-            overcast_episode_minutes.labels(
-                feed_slug=feed_slug,
-                played=label_combination["played"],
-                downloaded=label_combination["downloaded"],
-                did_download=label_combination["did_download"],
-            ).set(0)
+            labels = (
+                feed_slug,
+                label_combination["played"],
+                label_combination["downloaded"],
+                label_combination["did_download"],
+            )
+            episode_counts[labels] = 0
+            episode_minutes[labels] = 0
 
     for db_episode in ctx.db.episodes:
         feed_slug = feed_slugs[db_episode.feed_id]
@@ -518,27 +559,21 @@ def metrics(ctx: Context, metrics_filename: str | None) -> None:
                 db_episode.overcast_url,
             )
 
-        overcast_episode_count.labels(
-            feed_slug=feed_slug,
-            played=played,
-            downloaded=downloaded,
-            did_download=did_download,
-        ).inc()
+        labels = (feed_slug, played, downloaded, did_download)
+        episode_counts[labels] += 1
         if db_episode.duration:
-            minutes = db_episode.duration.total_seconds() / 60
-            overcast_episode_minutes.labels(
-                feed_slug=feed_slug,
-                played=played,
-                downloaded=downloaded,
-                did_download=did_download,
-            ).inc(minutes)
+            episode_minutes[labels] += db_episode.duration.total_seconds() / 60
+
+    for labels, count in episode_counts.items():
+        overcast_episode_count.labels(*labels).set(count)
+    for labels, minutes in episode_minutes.items():
+        overcast_episode_minutes.labels(*labels).set(minutes)
 
     if metrics_filename:
         logger.debug("Writing metrics to %s", metrics_filename)
         write_to_textfile(metrics_filename, registry)
     else:
-        for line in generate_latest(registry=registry).splitlines():
-            logger.info(line.decode())
+        logger.info("%s", generate_latest(registry=registry).decode().rstrip())
 
 
 @cli.command("purge-cache")
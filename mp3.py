@@ -0,0 +1,131 @@
+"""
+Read MP3 durations from the first few KB of a file.
+
+VBR files written by LAME or Xing carry a Xing/Info header, and Fraunhofer
+encoders write a VBRI header, in the first MPEG frame with the total frame
+count. Plain CBR files are estimated from the audio size and bitrate, the same
+way mutagen does.
+"""
+
+from dataclasses import dataclass
+
+_SAMPLE_RATES: dict[int, tuple[int, int, int]] = {
+    3: (44100, 48000, 32000),  # MPEG 1
+    2: (22050, 24000, 16000),  # MPEG 2
+    0: (11025, 12000, 8000),  # MPEG 2.5
+}
+
+_LAYER3_BITRATES: dict[int, tuple[int, ...]] = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    0: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+_SYNC_SEARCH_LIMIT = 4096
+
+
+@dataclass(slots=True, frozen=True)
+class _FrameHeader:
+    version: int
+    sample_rate: int
+    bitrate: int
+    mono: bool
+    padding: int
+
+    @property
+    def samples(self) -> int:
+        return 1152 if self.version == 3 else 576
+
+    @property
+    def length(self) -> int:
+        return (
+            self.samples // 8 * self.bitrate * 1000 // self.sample_rate + self.padding
+        )
+
+    @property
+    def side_info_size(self) -> int:
+        if self.version == 3:
+            return 17 if self.mono else 32
+        else:
+            return 9 if self.mono else 17
+
+
+def _parse_frame_header(data: bytes, pos: int) -> _FrameHeader | None:
+    if pos < 0 or pos + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[pos : pos + 4]
+    if b0 != 0xFF or b1 & 0xE0 != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0b11
+    layer = (b1 >> 1) & 0b11
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0b11
+    if version == 1 or layer != 1:
+        return None
+    if bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    return _FrameHeader(
+        version=version,
+        sample_rate=_SAMPLE_RATES[version][sample_rate_index],
+        bitrate=_LAYER3_BITRATES[version][bitrate_index],
+        mono=(b3 >> 6) == 0b11,
+        padding=(b2 >> 1) & 1,
+    )
+
+
+def _find_first_frame(data: bytes) -> tuple[int, _FrameHeader] | None:
+    pos = data.find(b"\xff", 0, _SYNC_SEARCH_LIMIT)
+    while pos != -1:
+        header = _parse_frame_header(data, pos)
+        # Require a second frame right after the first to rule out stray sync bits
+        if header and _parse_frame_header(data, pos + header.length):
+            return pos, header
+        pos = data.find(b"\xff", pos + 1, _SYNC_SEARCH_LIMIT)
+    return None
+
+
+def id3v2_size(data: bytes) -> int:
+    """
+    Size in bytes of a leading ID3v2 tag, or 0 if there isn't one.
+    """
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for b in data[6:10]:
+        size = (size << 7) | (b & 0x7F)
+    footer_size = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer_size
+
+
+def length(data: bytes, audio_size: int | None = None) -> float | None:
+    """
+    Length in seconds of MP3 audio starting at data, after any ID3v2 tag.
+
+    audio_size is the number of bytes from the start of data to the end of the
+    file, used to estimate CBR files that have no Xing/Info or VBRI header.
+    """
+    first_frame = _find_first_frame(data)
+    if first_frame is None:
+        return None
+    pos, header = first_frame
+
+    xing = pos + 4 + header.side_info_size
+    if data[xing : xing + 4] in (b"Xing", b"Info"):
+        flags = int.from_bytes(data[xing + 4 : xing + 8], "big")
+        if flags & 0x1 and len(data) >= xing + 12:
+            frames = int.from_bytes(data[xing + 8 : xing + 12], "big")
+            return frames * header.samples / header.sample_rate
+        return None
+
+    vbri = pos + 4 + 32
+    if data[vbri : vbri + 4] == b"VBRI":
+        if len(data) >= vbri + 18:
+            frames = int.from_bytes(data[vbri + 14 : vbri + 18], "big")
+            return frames * header.samples / header.sample_rate
+        return None
+
+    if audio_size is not None and audio_size > pos:
+        return (audio_size - pos) * 8 / (header.bitrate * 1000)
+    return None
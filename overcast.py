@@ -1,25 +1,37 @@
 import logging
+import os
 import re
 import sys
-from dataclasses import dataclass
+import threading
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta, timezone
-from io import BytesIO
+from functools import lru_cache, partial
 from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from types import MappingProxyType
 from typing import Literal, NewType, cast
 from urllib.parse import urlparse
 
 import dateutil.parser
 import mutagen
 import requests
-from bs4 import BeautifulSoup, Tag
 from lru_cache import PersistentLRUCache, bytesize
+from lxml import etree, html
+from requests.adapters import HTTPAdapter
 
+import mp3
 import requests_cache
 from utils import HTTPURL, URL
 
 logger = logging.getLogger("overcast")
 
 _RAISE_VALIDATION_ERRORS = "pytest" in sys.modules
+# Validation is assert based, so it is pointless under python -O
+_VALIDATE = __debug__ and (
+    _RAISE_VALIDATION_ERRORS or os.environ.get("OVERCAST_VALIDATE") == "1"
+)
 
 _SAFARI_UA = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -28,14 +40,16 @@ _SAFARI_UA = (
     "Safari/605.1.15"
 )
 
-_SAFARI_HEADERS = {
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    "Sec-Fetch-Site": "none",
-    "Sec-Fetch-Mode": "navigate",
-    "User-Agent": _SAFARI_UA,
-    "Accept-Language": "en-US,en;q=0.9",
-    "Sec-Fetch-Dest": "document",
-}
+_SAFARI_HEADERS = MappingProxyType(
+    {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Sec-Fetch-Site": "none",
+        "Sec-Fetch-Mode": "navigate",
+        "User-Agent": _SAFARI_UA,
+        "Accept-Language": "en-US,en;q=0.9",
+        "Sec-Fetch-Dest": "document",
+    }
+)
 
 # America/New_York
 _SERVER_TZINFO = timezone(-timedelta(hours=5))
@@ -102,6 +116,23 @@ class OvercastAppURI(URL):
         return str.__new__(cls, urlstring)
 
 
+def _overcast_fm_path(urlstring: str) -> str | None:
+    """
+    Path component of an https://overcast.fm URL, or None for any other URL.
+    """
+    if urlstring.startswith("https://overcast.fm/"):
+        path, _, _ = urlstring.removeprefix("https://overcast.fm").partition("#")
+        path, _, _ = path.partition("?")
+        return path
+    components = urlparse(urlstring)
+    if components.scheme != "https" or components.hostname != "overcast.fm":
+        return None
+    return components.path
+
+
+_FEED_PATH_RE = re.compile(r"^/(p\d+-[A-Za-z0-9]+|itunes\d+/[A-Za-z0-9-]+)$")
+
+
 class OvercastFeedURL(OvercastURL):
     """
     An https://overcast.fm/ feed URL.
@@ -109,14 +140,10 @@ class OvercastFeedURL(OvercastURL):
 
     def __new__(cls, urlstring: str) -> "OvercastFeedURL":
         try:
-            components = urlparse(urlstring)
-            if components.scheme != "https":
-                raise ValueError(f"Invalid overcast.fm feed URL: {urlstring}")
-            elif not components.hostname == "overcast.fm":
+            path = _overcast_fm_path(urlstring)
+            if path is None:
                 raise ValueError(f"Invalid overcast.fm feed URL: {urlstring}")
-            elif not re.match(
-                r"^/(p\d+-[A-Za-z0-9]+|itunes\d+/[A-Za-z0-9-]+)$", components.path
-            ):
+            elif not _FEED_PATH_RE.match(path):
                 raise ValueError(f"Got overcast.fm episode URL: {urlstring}")
         except ValueError as e:
             if _RAISE_VALIDATION_ERRORS:
@@ -127,6 +154,9 @@ class OvercastFeedURL(OvercastURL):
         return str.__new__(cls, urlstring)
 
 
+_EPISODE_PATH_RE = re.compile(r"^/(\+[A-Za-z0-9_-]+)$")
+
+
 class OvercastEpisodeURL(OvercastURL):
     """
     An https://overcast.fm/+ episode URL.
@@ -134,12 +164,10 @@ class OvercastEpisodeURL(OvercastURL):
 
     def __new__(cls, urlstring: str) -> "OvercastEpisodeURL":
         try:
-            components = urlparse(urlstring)
-            if components.scheme != "https":
-                raise ValueError(f"Invalid overcast.fm episode URL: {urlstring}")
-            elif not components.hostname == "overcast.fm":
+            path = _overcast_fm_path(urlstring)
+            if path is None:
                 raise ValueError(f"Invalid overcast.fm episode URL: {urlstring}")
-            elif not re.match(r"^/(\+[A-Za-z0-9_-]+)$", components.path):
+            elif not _EPISODE_PATH_RE.match(path):
                 raise ValueError(f"Invalid overcast.fm episode URL: {urlstring}")
         except ValueError as e:
             if _RAISE_VALIDATION_ERRORS:
@@ -170,11 +198,12 @@ class NotFound(Exception):
 class Session:
     requests_session: requests_cache.Session
     lru_cache: PersistentLRUCache
+    audio_session: requests.Session
+    lru_cache_lock: threading.Lock = field(default_factory=threading.Lock)
 
 
 def session(cache_dir: Path, cookie: str, offline: bool = False) -> Session:
-    headers = _SAFARI_HEADERS.copy()
-    headers["Cookie"] = f"o={cookie}; qr=-"
+    headers = {**_SAFARI_HEADERS, "Cookie": f"o={cookie}; qr=-"}
 
     lru_cache = PersistentLRUCache(
         filename=cache_dir / "overcast.pickle",
@@ -189,10 +218,65 @@ def session(cache_dir: Path, cookie: str, offline: bool = False) -> Session:
         offline=offline,
     )
 
-    return Session(requests_session=requests_session, lru_cache=lru_cache)
+    audio_session = requests.Session()
+    audio_session.headers.update(_SAFARI_HEADERS)
+    # Episode audio is spread across many podcast hosts, keep more host pools alive
+    audio_adapter = HTTPAdapter(pool_connections=32)
+    audio_session.mount("https://", audio_adapter)
+    audio_session.mount("http://", audio_adapter)
+
+    return Session(
+        requests_session=requests_session,
+        lru_cache=lru_cache,
+        audio_session=audio_session,
+    )
 
 
-@dataclass
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _select(xpath: etree.XPath, el: etree._Element) -> list[etree._Element]:
+    return cast(list[etree._Element], xpath(el))
+
+
+def _string(xpath: etree.XPath, el: etree._Element) -> str:
+    return str(xpath(el))
+
+
+def _attrs(el: etree._Element) -> Mapping[str, str]:
+    # lxml returns str attribute values on Python 3, the stubs say str | bytes
+    return cast(Mapping[str, str], el.attrib)
+
+
+_html_parsers = threading.local()
+
+
+def _parse_html(content: bytes) -> html.HtmlElement:
+    # lxml serialises use of a parser instance, so give each pool worker its own.
+    # overcast.fm serves UTF-8, let lxml decode the body instead of requests.
+    parser: html.HTMLParser | None = getattr(_html_parsers, "parser", None)
+    if parser is None:
+        parser = _html_parsers.parser = html.HTMLParser(encoding="utf-8")
+    return html.fromstring(content, parser=parser)
+
+
+_STRING_XPATH = etree.XPath("string()")
+
+
+def _text_by_class(el: etree._Element, class_names: frozenset[str]) -> dict[str, str]:
+    """
+    Text of the first descendant carrying each class name, in a single walk.
+    """
+    texts: dict[str, str] = {}
+    for child in el.iterdescendants("*"):
+        for name in _attrs(child).get("class", "").split():
+            if name in class_names and name not in texts:
+                texts[name] = str(_STRING_XPATH(child))
+    return texts
+
+
+@dataclass(slots=True, frozen=True)
 class HTMLPodcastsFeed:
     fetched_at: datetime
     overcast_url: OvercastFeedURL
@@ -226,6 +310,16 @@ class HTMLPodcastsFeed:
                 raise e
 
 
+_FEEDCELL_XPATH = etree.XPath(f"//a[{_has_class('feedcell')}][@href]")
+_FEEDCELL_ART_XPATH = etree.XPath(f"string(.//img[{_has_class('art')}]/@src)")
+_FEEDCELL_TITLE_XPATH = etree.XPath(
+    f"string(.//*[{_has_class('titlestack')}]/*[{_has_class('title')}])"
+)
+_UNPLAYED_INDICATOR_XPATH = etree.XPath(
+    f"boolean(.//*[{_has_class('unplayed_indicator')}])"
+)
+
+
 def fetch_podcasts(session: Session) -> list[HTMLPodcastsFeed]:
     r = _request(
         session=session,
@@ -238,28 +332,19 @@ def fetch_podcasts(session: Session) -> list[HTMLPodcastsFeed]:
 
     feeds: list[HTMLPodcastsFeed] = []
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    doc = _parse_html(r.content)
 
-    for feedcell_el in soup.select("a.feedcell[href]"):
-        href = feedcell_el.attrs["href"]
+    for feedcell_el in _select(_FEEDCELL_XPATH, doc):
+        href = _attrs(feedcell_el)["href"]
 
         if href == "/uploads":
             continue
 
         overcast_url = OvercastFeedURL(_overcast_fm_url_from_path(href))
 
-        if art_el := feedcell_el.select_one("img.art[src]"):
-            art_url = OvercastCDNURL(art_el.attrs["src"])
-        else:
-            art_url = OvercastCDNURL("")
-
-        title: str = ""
-        if title_el := feedcell_el.select_one(".titlestack > .title"):
-            title = title_el.text.strip()
-
-        has_unplayed_episodes = (
-            True if feedcell_el.select_one(".unplayed_indicator") else False
-        )
+        art_url = OvercastCDNURL(_string(_FEEDCELL_ART_XPATH, feedcell_el))
+        title = _string(_FEEDCELL_TITLE_XPATH, feedcell_el).strip()
+        has_unplayed_episodes = bool(_UNPLAYED_INDICATOR_XPATH(feedcell_el))
 
         feed = HTMLPodcastsFeed(
             fetched_at=fetched_at,
@@ -268,7 +353,8 @@ def fetch_podcasts(session: Session) -> list[HTMLPodcastsFeed]:
             title=title,
             has_unplayed_episodes=has_unplayed_episodes,
         )
-        feed._validate()
+        if _VALIDATE:
+            feed._validate()
         feeds.append(feed)
 
     if len(feeds) == 0:
@@ -277,7 +363,7 @@ def fetch_podcasts(session: Session) -> list[HTMLPodcastsFeed]:
     return feeds
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class HTMLPodcastFeed:
     fetched_at: datetime
     title: str
@@ -305,7 +391,7 @@ class HTMLPodcastFeed:
                 raise e
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class HTMLPodcastEpisode:
     fetched_at: datetime
     overcast_url: OvercastEpisodeURL
@@ -333,10 +419,10 @@ class HTMLPodcastEpisode:
             _SERVER_TZINFO,
         )
 
-    def _validate(self) -> None:
+    def _validate(self, today: date | None = None) -> None:
         try:
             assert self.title, self.title
-            assert self.date_published <= date.today(), self.date_published
+            assert self.date_published <= (today or date.today()), self.date_published
             assert self.download_state is not None, "unknown download state"
         except AssertionError as e:
             logger.error(e)
@@ -344,6 +430,13 @@ class HTMLPodcastEpisode:
                 raise e
 
 
+_APPLE_ITUNES_APP_XPATH = etree.XPath("//meta[@name='apple-itunes-app']/@content")
+_FULLART_XPATH = etree.XPath(f"string(//img[{_has_class('fullart')}]/@src)")
+_PODCAST_TITLE_XPATH = etree.XPath(f"string(//h2[{_has_class('centertext')}])")
+_EPISODECELL_XPATH = etree.XPath(f"//a[{_has_class('extendedepisodecell')}][@href]")
+_EPISODECELL_TEXT_CLASSES = frozenset({"title", "caption2", "lighttext"})
+
+
 def fetch_podcast(session: Session, feed_url: OvercastFeedURL) -> HTMLPodcastFeed:
     r = _request(
         session=session,
@@ -354,30 +447,27 @@ def fetch_podcast(session: Session, feed_url: OvercastFeedURL) -> HTMLPodcastFee
     )
     fetched_at = requests_cache.response_date(r)
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    doc = _parse_html(r.content)
 
     overcast_uri: str = ""
-    for meta_el in soup.select("meta[name=apple-itunes-app]"):
-        content = meta_el["content"]
-        if isinstance(content, str) and content.startswith("app-id=888422857"):
+    for content in cast(list[str], _APPLE_ITUNES_APP_XPATH(doc)):
+        if content.startswith("app-id=888422857"):
             overcast_uri = content.removeprefix("app-id=888422857, app-argument=")
 
-    feed_title: str = ""
-    if title_el := soup.select_one("h2.centertext"):
-        feed_title = title_el.text.strip()
+    feed_title = _string(_PODCAST_TITLE_XPATH, doc).strip()
 
     episodes: list[HTMLPodcastEpisode] = []
+    today = date.today()
 
-    for episodecell_el in soup.select("a.extendedepisodecell[href]"):
-        href: str = episodecell_el.attrs["href"]
+    for episodecell_el in _select(_EPISODECELL_XPATH, doc):
+        href: str = _attrs(episodecell_el)["href"]
         episode_url = OvercastEpisodeURL(_overcast_fm_url_from_path(href))
 
-        title: str = ""
-        if title_el := episodecell_el.select_one(".title"):
-            title = title_el.text.strip()
+        texts = _text_by_class(episodecell_el, _EPISODECELL_TEXT_CLASSES)
+        title = texts.get("title", "").strip()
 
         download_state: Literal["new"] | Literal["deleted"] | None = None
-        class_name = episodecell_el.attrs["class"]
+        class_name = _attrs(episodecell_el)["class"].split()
         if "userdeletedepisode" in class_name:
             download_state = "deleted"
         elif "usernewepisode" in class_name:
@@ -385,21 +475,20 @@ def fetch_podcast(session: Session, feed_url: OvercastFeedURL) -> HTMLPodcastFee
         else:
             assert False, f"Unknown download state: {class_name}"
 
-        if caption2_el := episodecell_el.select_one(".caption2"):
-            caption_result = parse_episode_caption_text(caption2_el.text)
-        assert caption_result
+        caption_result: CaptionResult | None = None
+        if caption2 := texts.get("caption2"):
+            caption_result = parse_episode_caption_text(caption2)
+        assert caption_result, f"Missing caption: {episode_url}"
 
         is_played: bool | None = None
-        if "usernewepisode" in class_name:
+        if download_state == "new":
             is_played = False
         elif caption_result.is_played is not None:
             is_played = caption_result.is_played
         else:
             is_played = None
 
-        description: str = ""
-        if description_el := episodecell_el.select_one(".lighttext"):
-            description = description_el.text.strip()
+        description = texts.get("lighttext", "").strip()
 
         episode = HTMLPodcastEpisode(
             fetched_at=fetched_at,
@@ -412,13 +501,11 @@ def fetch_podcast(session: Session, feed_url: OvercastFeedURL) -> HTMLPodcastFee
             in_progress=caption_result.in_progress,
             download_state=download_state,
         )
-        episode._validate()
+        if _VALIDATE:
+            episode._validate(today=today)
         episodes.append(episode)
 
-    if img_el := soup.select_one("img.fullart[src]"):
-        art_url = OvercastCDNURL(img_el.attrs["src"])
-    else:
-        art_url = OvercastCDNURL("")
+    art_url = OvercastCDNURL(_string(_FULLART_XPATH, doc))
 
     feed = HTMLPodcastFeed(
         fetched_at=fetched_at,
@@ -428,7 +515,8 @@ def fetch_podcast(session: Session, feed_url: OvercastFeedURL) -> HTMLPodcastFee
         title=feed_title,
         episodes=episodes,
     )
-    feed._validate()
+    if _VALIDATE:
+        feed._validate()
     return feed
 
 
@@ -448,7 +536,7 @@ def _mean_date_published_interval(episodes: list[HTMLPodcastEpisode]) -> timedel
     return mean_interval
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CaptionResult:
     date_published: date
     duration: timedelta | None
@@ -456,41 +544,46 @@ class CaptionResult:
     in_progress: bool | None = None
 
 
+_CAPTION_RE = re.compile(
+    r"^(?P<date>[^•]+?)"
+    r"(?: • (?:(?P<minutes>\d+) min|(?P<played>played)|(?P<left>.*left)|(?P<at>at .*)))?$"
+)
+
+
+@lru_cache(maxsize=1024)
 def parse_episode_caption_text(text: str) -> CaptionResult:
     text = text.strip()
-    parts = text.split(" • ", 2)
-    assert len(parts) >= 1, text
+
+    match = _CAPTION_RE.match(text)
+    if not match:
+        logger.warning("Unknown caption2 format: %s", text)
+        date_text, _, _ = text.partition(" • ")
+        return CaptionResult(date_published=_parse_date(date_text), duration=None)
 
     duration: timedelta | None = None
     in_progress: bool | None
     is_played: bool | None
 
-    date_published = dateutil.parser.parse(parts[0], default=_SERVER_NOW).date()
+    date_published = _parse_date(match["date"])
 
-    if len(parts) == 2 and parts[1] == "played":
+    # Most captions are unplayed episodes with a duration, so check that first
+    if minutes := match["minutes"]:
+        duration = timedelta(minutes=int(minutes))
         in_progress = False
-        is_played = True
-
-    elif len(parts) == 2 and parts[1].endswith("left"):
-        in_progress = True
         is_played = False
 
-    elif len(parts) == 2 and parts[1].startswith("at "):
-        in_progress = True
-        is_played = False
-
-    elif len(parts) == 2:
-        duration = _parse_duration(parts[1])
+    elif match["played"]:
         in_progress = False
+        is_played = True
+
+    elif match["left"] or match["at"]:
+        in_progress = True
         is_played = False
 
-    elif len(parts) == 1:
+    else:
         in_progress = None
         is_played = None
 
-    else:
-        logger.warning("Unknown caption2 format: %s", text)
-
     return CaptionResult(
         date_published=date_published,
         duration=duration,
@@ -499,7 +592,7 @@ def parse_episode_caption_text(text: str) -> CaptionResult:
     )
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class HTMLEpisode:
     fetched_at: datetime
     overcast_url: OvercastEpisodeURL
@@ -551,6 +644,21 @@ class HTMLEpisode:
                 raise e
 
 
+_TWITTER_PLAYER_STREAM_XPATH = etree.XPath(
+    "string(//meta[@name='twitter:player:stream']/@content)"
+)
+_OG_DESCRIPTION_XPATH = etree.XPath("string(//meta[@name='og:description']/@content)")
+_EPISODE_PODCAST_LINK_XPATH = etree.XPath(
+    f"string(//*[{_has_class('centertext')}]/h3/a/@href)"
+)
+_EPISODE_TITLE_XPATH = etree.XPath(f"string(//*[{_has_class('centertext')}]/h2)")
+_EPISODE_DATE_XPATH = etree.XPath(f"string(//*[{_has_class('centertext')}]/div)")
+_NEW_EPISODE_XPATH = etree.XPath(f"boolean(//*[{_has_class('new_episode_for_user')}])")
+_EXISTING_EPISODE_XPATH = etree.XPath(
+    f"boolean(//*[{_has_class('existing_episode_for_user')}])"
+)
+
+
 def fetch_episode(session: Session, episode_url: OvercastEpisodeURL) -> HTMLEpisode:
     r = _request(
         session=session,
@@ -561,47 +669,35 @@ def fetch_episode(session: Session, episode_url: OvercastEpisodeURL) -> HTMLEpis
     )
     fetched_at = requests_cache.response_date(r)
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    doc = _parse_html(r.content)
 
     overcast_uri: str = ""
-    if meta_el := soup.select_one("meta[name=apple-itunes-app]"):
-        content: str = meta_el.attrs["content"]
+    for content in cast(list[str], _APPLE_ITUNES_APP_XPATH(doc))[:1]:
         if content.startswith("app-id=888422857"):
             overcast_uri = content.removeprefix("app-id=888422857, app-argument=")
 
-    if img_el := soup.select_one("img.fullart[src]"):
-        art_url = OvercastCDNURL(img_el.attrs["src"])
-    else:
-        art_url = OvercastCDNURL("")
+    art_url = OvercastCDNURL(_string(_FULLART_XPATH, doc))
 
-    enclosure_url: str = ""
-    if meta_el := soup.select_one("meta[name='twitter:player:stream']"):
-        enclosure_url = meta_el.attrs["content"]
-        enclosure_url = enclosure_url.split("#", 1)[0]
+    enclosure_url = _string(_TWITTER_PLAYER_STREAM_XPATH, doc)
+    enclosure_url = enclosure_url.split("#", 1)[0]
 
-    if a_el := soup.select_one(".centertext > h3 > a[href]"):
-        href = a_el.attrs["href"]
+    if href := _string(_EPISODE_PODCAST_LINK_XPATH, doc):
         podcast_overcast_url = OvercastFeedURL(_overcast_fm_url_from_path(href))
     else:
         podcast_overcast_url = OvercastFeedURL("")
 
-    title: str = ""
-    if title_el := soup.select_one(".centertext > h2"):
-        title = title_el.text.strip()
-
-    description: str = ""
-    if description_el := soup.select_one("meta[name='og:description']"):
-        description = description_el.attrs["content"]
+    title = _string(_EPISODE_TITLE_XPATH, doc).strip()
+    description = _string(_OG_DESCRIPTION_XPATH, doc)
 
     date_published: date | None = None
-    if div_el := soup.select_one(".centertext > div"):
-        date_published = dateutil.parser.parse(div_el.text, default=_SERVER_NOW).date()
+    if date_text := _string(_EPISODE_DATE_XPATH, doc):
+        date_published = _parse_date(date_text)
     assert date_published
 
     download_state: Literal["new"] | Literal["existing"] | None = None
-    if soup.select_one(".new_episode_for_user"):
+    if _NEW_EPISODE_XPATH(doc):
         download_state = "new"
-    elif soup.select_one(".existing_episode_for_user"):
+    elif _EXISTING_EPISODE_XPATH(doc):
         download_state = "existing"
     else:
         assert False, "Unknown download state"
@@ -618,21 +714,82 @@ def fetch_episode(session: Session, episode_url: OvercastEpisodeURL) -> HTMLEpis
         enclosure_url=HTTPURL(enclosure_url),
         download_state=download_state,
     )
-    episode._validate()
+    if _VALIDATE:
+        episode._validate()
     return episode
 
 
-def _fetch_audio_duration(url: HTTPURL) -> timedelta | None:
-    response = requests.get(str(url), allow_redirects=True, headers=_SAFARI_HEADERS)
-    if not response.ok:
-        logger.warning("Failed to fetch audio: %s", url)
+# Episodes are fetched whole so mutagen can estimate CBR durations from the file
+# size, spool anything larger than this to disk instead of holding it in memory
+_AUDIO_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+_AUDIO_PROBE_SIZE = 64 * 1024
+_MP3_HEADER_MIN_SIZE = 8 * 1024
+
+
+def _fetch_audio_range(
+    audio_session: requests.Session, url: HTTPURL, start: int
+) -> tuple[bytes, int | None] | None:
+    headers = {"Range": f"bytes={start}-{start + _AUDIO_PROBE_SIZE - 1}"}
+    with audio_session.get(
+        str(url), headers=headers, allow_redirects=True, stream=True
+    ) as response:
+        if response.status_code != 206:
+            return None
+        _, _, total_size = response.headers.get("Content-Range", "").rpartition("/")
+        return response.content, int(total_size) if total_size.isdigit() else None
+
+
+def _fetch_mp3_duration(
+    audio_session: requests.Session, url: HTTPURL
+) -> timedelta | None:
+    probe = _fetch_audio_range(audio_session, url, start=0)
+    if probe is None:
         return None
-    io = BytesIO(response.content)
-    try:
-        f = mutagen.File(io)  # type: ignore
-    except Exception:
-        logger.error("Failed to parse audio: %s", url)
+    data, total_size = probe
+
+    offset = mp3.id3v2_size(data)
+    if len(data) - offset < _MP3_HEADER_MIN_SIZE:
+        # Embedded artwork can push the first frame past the probe
+        probe = _fetch_audio_range(audio_session, url, start=offset)
+        if probe is None:
+            return None
+        data = probe[0]
+    else:
+        data = data[offset:]
+
+    audio_size = total_size - offset if total_size is not None else None
+    seconds = mp3.length(data, audio_size=audio_size)
+    if seconds is None:
         return None
+    return timedelta(seconds=int(seconds))
+
+
+def _fetch_audio_duration(
+    audio_session: requests.Session, url: HTTPURL
+) -> timedelta | None:
+    # Most MP3s can be timed from their first frame, only download the whole
+    # file for mutagen when the server ignores Range or the format is unknown.
+    is_mp3 = urlparse(url).path.lower().endswith(".mp3")
+    if is_mp3 and (duration := _fetch_mp3_duration(audio_session, url)):
+        return duration
+
+    with (
+        audio_session.get(str(url), allow_redirects=True, stream=True) as response,
+        SpooledTemporaryFile(max_size=_AUDIO_SPOOL_MAX_SIZE) as io,
+    ):
+        if not response.ok:
+            logger.warning("Failed to fetch audio: %s", url)
+            return None
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            io.write(chunk)
+        io.seek(0)
+        try:
+            f = mutagen.File(io)  # type: ignore
+        except Exception:
+            logger.error("Failed to parse audio: %s", url)
+            return None
     if f is None:
         logger.error("Failed to parse audio: %s", url)
         return None
@@ -641,19 +798,38 @@ def _fetch_audio_duration(url: HTTPURL) -> timedelta | None:
 
 
 def fetch_audio_duration(session: Session, url: HTTPURL) -> timedelta | None:
-    def _inner() -> timedelta | None:
-        if session.requests_session._offline:
-            raise requests_cache.OfflineError()
-        elif duration := _fetch_audio_duration(url):
-            return duration
-        else:
-            return None
-
     key = f"fetch_audio_duration:v4:{url}"
-    return session.lru_cache.get_or_load(key, load_value=_inner)
 
+    # PersistentLRUCache isn't thread-safe, only touch it while holding the lock
+    # and fetch the audio outside of it so pool workers still overlap
+    with session.lru_cache_lock:
+        try:
+            return cast(timedelta | None, session.lru_cache[key])
+        except KeyError:
+            pass
 
-@dataclass
+    if session.requests_session._offline:
+        raise requests_cache.OfflineError()
+    duration = _fetch_audio_duration(session.audio_session, url) or None
+
+    with session.lru_cache_lock:
+        session.lru_cache[key] = duration
+    return duration
+
+
+def fetch_audio_durations(
+    session: Session, urls: Iterable[HTTPURL], max_workers: int = 8
+) -> dict[HTTPURL, timedelta | None]:
+    """
+    Fetch the durations of many audio URLs concurrently, keyed by URL.
+    """
+    unique_urls = list(dict.fromkeys(urls))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        durations = executor.map(partial(fetch_audio_duration, session), unique_urls)
+        return dict(zip(unique_urls, durations))
+
+
+@dataclass(slots=True, frozen=True)
 class AccountExport:
     fetched_at: datetime
     feeds: list["ExportFeed"]
@@ -669,14 +845,14 @@ def export_account_data(session: Session) -> AccountExport:
     )
     fetched_at = requests_cache.response_date(r)
 
-    soup = BeautifulSoup(r.content, "xml")
+    root = etree.fromstring(r.content)
     return AccountExport(
         fetched_at=fetched_at,
-        feeds=_opml_feeds(soup, fetched_at=fetched_at),
+        feeds=_opml_feeds(root, fetched_at=fetched_at),
     )
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ExportFeed:
     fetched_at: datetime
     item_id: OvercastFeedItemID
@@ -685,28 +861,32 @@ class ExportFeed:
     html_url: HTTPURL
     added_at: datetime
 
-    def _validate(self) -> None:
+    def _validate(self, now: datetime | None = None) -> None:
         try:
             assert self.title, self.title
             assert self.added_at.tzinfo, "added date must be timezone-aware"
-            assert self.added_at < datetime.now(timezone.utc), self.added_at
+            assert self.added_at < (now or datetime.now(timezone.utc)), self.added_at
         except AssertionError as e:
             logger.error(e)
             if _RAISE_VALIDATION_ERRORS:
                 raise e
 
 
-def _opml_feeds(soup: BeautifulSoup, fetched_at: datetime) -> list[ExportFeed]:
+# Anchored at the document root so lookups don't descend into every episode outline
+_OPML_FEED_XPATH = etree.XPath("/opml/body/outline[@text='feeds']/outline[@type='rss']")
+
+
+def _opml_feeds(root: etree._Element, fetched_at: datetime) -> list[ExportFeed]:
     feeds: list[ExportFeed] = []
+    now = datetime.now(timezone.utc)
 
-    for outline in soup.select("outline[text='feeds'] > outline[type='rss']"):
-        item_id: int = int(outline.attrs["overcastId"])
-        title: str = outline.attrs["title"]
-        html_url: str = outline.attrs["htmlUrl"]
-        xml_url: str = outline.attrs["xmlUrl"]
-        added_at = dateutil.parser.parse(
-            outline.attrs["overcastAddedDate"], default=_SERVER_NOW
-        )
+    for outline in _select(_OPML_FEED_XPATH, root):
+        attrs = _attrs(outline)
+        item_id: int = int(attrs["overcastId"])
+        title: str = attrs["title"]
+        html_url: str = attrs["htmlUrl"]
+        xml_url: str = attrs["xmlUrl"]
+        added_at = _parse_datetime(attrs["overcastAddedDate"])
 
         feed = ExportFeed(
             fetched_at=fetched_at,
@@ -716,14 +896,15 @@ def _opml_feeds(soup: BeautifulSoup, fetched_at: datetime) -> list[ExportFeed]:
             html_url=HTTPURL(html_url),
             added_at=added_at,
         )
-        feed._validate()
+        if _VALIDATE:
+            feed._validate(now=now)
         feeds.append(feed)
 
     logger.debug("Found %d feeds in export", len(feeds))
     return feeds
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AccountExtendedExport:
     fetched_at: datetime
     playlists: list["ExtendedExportPlaylist"]
@@ -740,11 +921,11 @@ def export_account_extended_data(session: Session) -> AccountExtendedExport:
     )
     fetched_at = requests_cache.response_date(r)
 
-    soup = BeautifulSoup(r.content, "xml")
+    root = etree.fromstring(r.content)
     return AccountExtendedExport(
         fetched_at=fetched_at,
-        playlists=_opml_extended_playlists(soup, fetched_at=fetched_at),
-        feeds=_opml_extended_feeds(soup, fetched_at=fetched_at),
+        playlists=_opml_extended_playlists(root, fetched_at=fetched_at),
+        feeds=_opml_extended_feeds(root, fetched_at=fetched_at),
     )
 
 
@@ -763,7 +944,7 @@ _PLAYLIST_SORTING_VALUES: list[str] = [
 ]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ExtendedExportPlaylist:
     fetched_at: datetime
     title: str
@@ -781,25 +962,29 @@ class ExtendedExportPlaylist:
                 raise e
 
 
+_OPML_PLAYLIST_XPATH = etree.XPath(
+    "/opml/body/outline[@text='playlists']/outline[@type='podcast-playlist']"
+)
+
+
 def _opml_extended_playlists(
-    soup: BeautifulSoup, fetched_at: datetime
+    root: etree._Element, fetched_at: datetime
 ) -> list[ExtendedExportPlaylist]:
     playlists: list[ExtendedExportPlaylist] = []
 
-    for outline in soup.select(
-        "outline[text='playlists'] > outline[type='podcast-playlist']"
-    ):
-        title: str = outline.attrs["title"]
-        smart: bool = outline.attrs["smart"] == "1"
-        sorting = cast(_PLAYLIST_SORTING_TYPE, outline.attrs["sorting"])
+    for outline in _select(_OPML_PLAYLIST_XPATH, root):
+        attrs = _attrs(outline)
+        title: str = attrs["title"]
+        smart: bool = attrs["smart"] == "1"
+        sorting = cast(_PLAYLIST_SORTING_TYPE, attrs["sorting"])
 
         episode_ids: list[OvercastEpisodeItemID] = []
-        if include_episode_ids_str := outline.attrs.get("includeEpisodeIds", ""):
+        if include_episode_ids_str := attrs.get("includeEpisodeIds", ""):
             episode_ids = [
                 OvercastEpisodeItemID(int(id))
                 for id in include_episode_ids_str.split(",")
             ]
-        elif sorted_episode_ids_str := outline.attrs.get("sortedEpisodeIds", ""):
+        elif sorted_episode_ids_str := attrs.get("sortedEpisodeIds", ""):
             episode_ids = [
                 OvercastEpisodeItemID(int(id))
                 for id in sorted_episode_ids_str.split(",")
@@ -812,14 +997,15 @@ def _opml_extended_playlists(
             sorting=sorting,
             episode_ids=episode_ids,
         )
-        playlist._validate()
+        if _VALIDATE:
+            playlist._validate()
         playlists.append(playlist)
 
     logger.debug("Found %d playlists in extended export", len(playlists))
     return playlists
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ExtendedExportFeed:
     fetched_at: datetime
     item_id: OvercastFeedItemID
@@ -830,11 +1016,11 @@ class ExtendedExportFeed:
     is_subscribed: bool
     episodes: list["ExtendedExportEpisode"]
 
-    def _validate(self) -> None:
+    def _validate(self, now: datetime | None = None) -> None:
         try:
             assert self.title, self.title
             assert self.added_at.tzinfo, "added date must be timezone-aware"
-            assert self.added_at < datetime.now(timezone.utc), self.added_at
+            assert self.added_at < (now or datetime.now(timezone.utc)), self.added_at
         except AssertionError as e:
             logger.error(e)
             if _RAISE_VALIDATION_ERRORS:
@@ -842,19 +1028,19 @@ class ExtendedExportFeed:
 
 
 def _opml_extended_feeds(
-    soup: BeautifulSoup, fetched_at: datetime
+    root: etree._Element, fetched_at: datetime
 ) -> list[ExtendedExportFeed]:
     feeds: list[ExtendedExportFeed] = []
+    now = datetime.now(timezone.utc)
 
-    for outline in soup.select("outline[text='feeds'] > outline[type='rss']"):
-        item_id = OvercastFeedItemID(int(outline.attrs["overcastId"]))
-        title: str = outline.attrs["title"]
-        html_url = HTTPURL(outline.attrs["htmlUrl"])
-        xml_url = HTTPURL(outline.attrs["xmlUrl"])
-        added_at = dateutil.parser.parse(
-            outline.attrs["overcastAddedDate"], default=_SERVER_NOW
-        )
-        is_subscribed: bool = outline.attrs.get("subscribed", "0") == "1"
+    for outline in _select(_OPML_FEED_XPATH, root):
+        attrs = _attrs(outline)
+        item_id = OvercastFeedItemID(int(attrs["overcastId"]))
+        title: str = attrs["title"]
+        html_url = HTTPURL(attrs["htmlUrl"])
+        xml_url = HTTPURL(attrs["xmlUrl"])
+        added_at = _parse_datetime(attrs["overcastAddedDate"])
+        is_subscribed: bool = attrs.get("subscribed", "0") == "1"
 
         feed = ExtendedExportFeed(
             fetched_at=fetched_at,
@@ -864,9 +1050,10 @@ def _opml_extended_feeds(
             html_url=html_url,
             added_at=added_at,
             is_subscribed=is_subscribed,
-            episodes=_opml_extended_episode(outline, fetched_at=fetched_at),
+            episodes=_opml_extended_episode(outline, fetched_at=fetched_at, now=now),
         )
-        feed._validate()
+        if _VALIDATE:
+            feed._validate(now=now)
         feeds.append(feed)
 
     feed_count = len(feeds)
@@ -877,7 +1064,7 @@ def _opml_extended_feeds(
     return feeds
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ExtendedExportEpisode:
     fetched_at: datetime
     date_published: datetime
@@ -895,43 +1082,41 @@ class ExtendedExportEpisode:
     def is_deleted(self) -> bool:
         return True if self.user_deleted else False
 
-    def _validate(self) -> None:
+    def _validate(self, now: datetime | None = None) -> None:
+        now = now or datetime.now(timezone.utc)
         try:
             assert self.title, self.title
             assert self.date_published.tzinfo, "published date must be timezone-aware"
             assert self.user_updated_at.tzinfo, "updated date must be timezone-aware"
-            assert self.date_published <= datetime.now(timezone.utc), (
-                self.date_published
-            )
-            assert self.user_updated_at < datetime.now(timezone.utc), (
-                self.user_updated_at
-            )
+            assert self.date_published <= now, self.date_published
+            assert self.user_updated_at < now, self.user_updated_at
         except AssertionError as e:
             logger.error(e)
             if _RAISE_VALIDATION_ERRORS:
                 raise e
 
 
+_OPML_EPISODE_XPATH = etree.XPath("outline[@type='podcast-episode']")
+
+
 def _opml_extended_episode(
-    rss_outline: Tag, fetched_at: datetime
+    rss_outline: etree._Element, fetched_at: datetime, now: datetime | None = None
 ) -> list[ExtendedExportEpisode]:
     episodes: list[ExtendedExportEpisode] = []
-
-    for outline in rss_outline.select("outline[type='podcast-episode']"):
-        overcast_url = OvercastEpisodeURL(outline.attrs["overcastUrl"])
-        item_id = OvercastEpisodeItemID(int(outline.attrs["overcastId"]))
-        date_published = dateutil.parser.parse(
-            outline.attrs["pubDate"], default=_SERVER_NOW
-        )
-        title: str = outline.attrs["title"]
-        url = HTTPURL(outline.attrs["url"])
-        enclosure_url = HTTPURL(outline.attrs["enclosureUrl"])
-        user_updated_at = dateutil.parser.parse(
-            outline.attrs["userUpdatedDate"], default=_SERVER_NOW
-        )
-        user_deleted: bool = outline.attrs.get("userDeleted", "0") == "1"
-        progress: int = int(outline.attrs.get("progress", "0"))
-        is_played: bool = outline.attrs.get("played", "0") == "1"
+    now = now or datetime.now(timezone.utc)
+
+    for outline in _select(_OPML_EPISODE_XPATH, rss_outline):
+        attrs = _attrs(outline)
+        overcast_url = OvercastEpisodeURL(attrs["overcastUrl"])
+        item_id = OvercastEpisodeItemID(int(attrs["overcastId"]))
+        date_published = _parse_datetime(attrs["pubDate"])
+        title: str = attrs["title"]
+        url = HTTPURL(attrs["url"])
+        enclosure_url = HTTPURL(attrs["enclosureUrl"])
+        user_updated_at = _parse_datetime(attrs["userUpdatedDate"])
+        user_deleted: bool = attrs.get("userDeleted", "0") == "1"
+        progress: int = int(attrs.get("progress", "0"))
+        is_played: bool = attrs.get("played", "0") == "1"
 
         episode = ExtendedExportEpisode(
             fetched_at=fetched_at,
@@ -946,7 +1131,8 @@ def _opml_extended_episode(
             progress=progress,
             is_played=is_played,
         )
-        episode._validate()
+        if _VALIDATE:
+            episode._validate(now=now)
         episodes.append(episode)
 
     return episodes
@@ -957,7 +1143,7 @@ _CONTROLER = Literal["index", "podcast", "episode", "export"]
 
 def last_request_date(session: Session, url: OvercastURL) -> datetime:
     request = session.requests_session.get_request(url, request_accept="text/html")
-    if cached_response := session.requests_session.cached_response(request):
+    if cached_response := session.requests_session.cached_response_head(request):
         return requests_cache.response_date(cached_response)
     return datetime.min
 
@@ -975,6 +1161,7 @@ def _request(
             path=path,
             request_accept=accept,
             response_expires_in=response_expires_in,
+            not_found_expires_in=timedelta(hours=6),
         )
     except requests.HTTPError as e:
         if e.response.status_code == 429:
@@ -986,27 +1173,55 @@ def _request(
         else:
             raise e
 
-    if 'href="/login">Log In</a>' in response.text:
+    if b'href="/login">Log In</a>' in response.content:
         logger.critical("Received logged out page")
         raise LoggedOutError()
 
     return response
 
 
+_ART_URL_RE = re.compile(r"https://public.overcast-cdn.com/art/(\d+)")
+
+
 def _extract_feed_id_from_art_url(url: OvercastCDNURL) -> OvercastFeedItemID:
     """
     Extract numeric feed-id from an Overcast CDN artwork URL.
     e.g. "https://public.overcast-cdn.com/art/126160?v198"
     """
-    m = re.match(r"https://public.overcast-cdn.com/art/(\d+)", url)
+    m = _ART_URL_RE.match(url)
     assert m, f"Couldn't extract feed-id from art URL: {url}"
     id = int(m.group(1))
     return OvercastFeedItemID(id)
 
 
-def _parse_duration(text: str) -> timedelta:
+def _parse_datetime(text: str) -> datetime:
+    """
+    Parse an ISO 8601 timestamp, falling back to dateutil for anything else.
+    e.g. "2014-07-16T16:56:20-04:00"
+    """
+    if "T" in text:
+        try:
+            dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+        else:
+            return dt if dt.tzinfo else dt.replace(tzinfo=_SERVER_TZINFO)
+    return dateutil.parser.parse(text, default=_SERVER_NOW)
+
+
+@lru_cache(maxsize=1024)
+def _parse_date(text: str) -> date:
+    """
+    Parse a caption date, falling back to dateutil for anything else.
+    e.g. "Feb 4, 2019" or "Apr 11" for the current year
+    """
     text = text.strip()
-    assert text.endswith(" min"), text
-    text = text[:-4]
-    minutes = int(text)
-    return timedelta(minutes=minutes)
+    try:
+        return datetime.strptime(text, "%b %d, %Y").date()
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(f"{text}, {_SERVER_NOW.year}", "%b %d, %Y").date()
+    except ValueError:
+        pass
+    return dateutil.parser.parse(text, default=_SERVER_NOW).date()
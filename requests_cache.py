@@ -1,4 +1,5 @@
 import logging
+import threading
 import time
 from collections.abc import Iterator
 from datetime import datetime, timedelta
@@ -29,6 +30,7 @@ class Session:
     _session: requests.Session
     _min_time_between_requests: timedelta
     _last_request_at: datetime = datetime.min
+    _throttle_lock: threading.Lock
     _offline: bool
 
     mime_type_extnames: dict[str, str]
@@ -49,6 +51,7 @@ class Session:
         self._session = requests.Session()
         self._session.headers.update(headers)
         self._min_time_between_requests = min_time_between_requests
+        self._throttle_lock = threading.Lock()
         self._offline = offline
 
         self.mime_type_extnames = _DEFAULT_MIME_TYPE_EXTNAMES.copy()
@@ -73,6 +76,7 @@ class Session:
         request_accept: str | None = None,
         response_expires_in: timedelta = timedelta(seconds=0),
         stale_cache_on_error: bool = True,
+        not_found_expires_in: timedelta = timedelta(seconds=0),
     ) -> tuple[requests.Response, bool]:
         request = self.get_request(url=path, request_accept=request_accept)
 
@@ -82,6 +86,7 @@ class Session:
         cached_response: requests.Response | None = None
         if filepath.exists():
             cached_response = bytes_to_response(filepath.read_bytes())
+            cached_response.url = request.url
             cache_response_date = response_date(cached_response)
             cache_expires = response_expires(cached_response)
             logger.debug(
@@ -92,6 +97,7 @@ class Session:
 
             if cache_expires > datetime.now():
                 logger.debug("Cache valid")
+                cached_response.raise_for_status()
                 return cached_response, True
             else:
                 logger.debug("Cache expired at %s", cache_expires)
@@ -99,25 +105,48 @@ class Session:
         if self._offline is True:
             if cached_response:
                 logger.warning("Offline mode, returning stale cache")
+                cached_response.raise_for_status()
                 return cached_response, True
             logger.error("Offline mode, no cache available")
             raise OfflineError()
 
+        if cached_response:
+            if etag := cached_response.headers.get("ETag"):
+                request.headers["If-None-Match"] = etag
+            if last_modified := cached_response.headers.get("Last-Modified"):
+                request.headers["If-Modified-Since"] = last_modified
+
         self._throttle()
         logger.warning("GET %s", request.url)
         prepped = self._session.prepare_request(request)
         r = self._session.send(prepped)
 
+        if r.status_code == 304 and cached_response:
+            logger.debug("Cache not modified")
+            if "Date" in r.headers:
+                cached_response.headers["Date"] = r.headers["Date"]
+            r = cached_response
+
         try:
             r.raise_for_status()
         except requests.HTTPError as e:
-            if stale_cache_on_error and cached_response:
+            if stale_cache_on_error and cached_response and cached_response.ok:
                 logger.warning("Request failed, returning stale cache")
                 return cached_response, True
 
+            if r.status_code == 404 and not_found_expires_in:
+                logger.debug("Caching not found response")
+                self._write_cache(filepath, r, not_found_expires_in)
+
             raise e
 
-        response_expires_at = response_date(r) + response_expires_in
+        self._write_cache(filepath, r, response_expires_in)
+        return r, r is cached_response
+
+    def _write_cache(
+        self, filepath: Path, r: requests.Response, expires_in: timedelta
+    ) -> None:
+        response_expires_at = response_date(r) + expires_in
         logger.debug("Response will expire at %s", response_expires_at)
         r.headers["Expires"] = response_expires_at.strftime("%a, %d %b %Y %H:%M:%S GMT")
 
@@ -125,16 +154,15 @@ class Session:
         with filepath.open("wb") as f:
             f.write(response_to_bytes(r))
 
-        return r, False
-
     def _throttle(self) -> None:
-        seconds_to_wait = (
-            self._last_request_at + self._min_time_between_requests - datetime.now()
-        ).total_seconds()
-        if seconds_to_wait > 0:
-            logger.warning("Waiting %s seconds...", seconds_to_wait)
-            time.sleep(seconds_to_wait)
-        self._last_request_at = datetime.now()
+        with self._throttle_lock:
+            seconds_to_wait = (
+                self._last_request_at + self._min_time_between_requests - datetime.now()
+            ).total_seconds()
+            if seconds_to_wait > 0:
+                logger.warning("Waiting %s seconds...", seconds_to_wait)
+                time.sleep(seconds_to_wait)
+            self._last_request_at = datetime.now()
 
     def cache_path(self, request: requests.Request) -> Path:
         assert request.url.startswith(self._base_url), request.url
@@ -163,8 +191,25 @@ class Session:
             return None
         return bytes_to_response(path.read_bytes())
 
+    def cached_response_head(
+        self, request: requests.Request
+    ) -> requests.Response | None:
+        """
+        Like cached_response, but only read the status line and headers.
+        """
+        path = self.cache_path(request)
+        if not path.exists():
+            return None
+        head = b""
+        with path.open("rb") as f:
+            for line in f:
+                head += line
+                if line == b"\n":
+                    break
+        return bytes_to_response(head)
+
     def is_cache_fresh(self, request: requests.Request) -> bool:
-        if response := self.cached_response(request):
+        if response := self.cached_response_head(request):
             expires = response_expires(response)
             return datetime.now() < expires
         return False
@@ -216,14 +261,16 @@ def bytes_to_response(data: bytes) -> requests.Response:
     """
     Parse raw HTTP/1.1 response into a requests.Response object.
     """
-    lines = data.splitlines()
-    _, status_code, reason = lines[0].decode("ascii").split(" ", 2)
+    head, sep, body = data.partition(b"\n\n")
+    if not sep:
+        raise ValueError("Missing end of response headers")
+
+    status_line, *header_lines = head.decode("ascii").split("\n")
+    _, status_code, reason = status_line.split(" ", 2)
     headers: CaseInsensitiveDict[str] = CaseInsensitiveDict()
-    body_index = lines.index(b"")
-    for line in lines[1:body_index]:
-        k, v = line.decode("ascii").split(": ", 1)
+    for line in header_lines:
+        k, v = line.split(": ", 1)
         headers[k] = v
-    body = b"\n".join(lines[body_index + 1 :])
 
     response = requests.Response()
     response.status_code = int(status_code)
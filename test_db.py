@@ -1,4 +1,8 @@
-from db import Feed
+from datetime import datetime, timezone
+from functools import partial
+
+from db import Episode, EpisodeCollection, Feed
+from overcast import OvercastEpisodeURL, OvercastFeedItemID
 
 
 def test_feed_dict_roundtrip() -> None:
@@ -14,3 +18,49 @@ def test_feed_dict_roundtrip() -> None:
         "is_following": "1",
     }
     assert feed_dict == Feed.from_dict(feed_dict).to_dict()
+
+
+def test_episode_collection_insert_or_update() -> None:
+    def make_episode(url: OvercastEpisodeURL, title: str) -> Episode:
+        return Episode(
+            id=None,
+            overcast_url=url,
+            feed_id=OvercastFeedItemID(1),
+            title=title,
+            enclosure_url=None,
+            duration=None,
+            date_published=datetime(2024, 1, 1, tzinfo=timezone.utc),
+            is_played=None,
+            is_downloaded=False,
+            did_download=False,
+        )
+
+    def on_update(e: Episode) -> Episode:
+        e.title = "Updated"
+        return e
+
+    url = OvercastEpisodeURL("https://overcast.fm/+ABCDEFG")
+    episodes = EpisodeCollection()
+
+    episodes.insert_or_update(url, partial(make_episode, title="New"), on_update)
+    assert [e.title for e in episodes] == ["New"]
+
+    episodes.insert_or_update(url, partial(make_episode, title="New"), on_update)
+    assert [e.title for e in episodes] == ["Updated"]
+
+    episodes.insert_or_update(
+        url, partial(make_episode, title="New"), lambda e: make_episode(url, "Replaced")
+    )
+    assert [e.title for e in episodes] == ["Replaced"]
+
+    del episodes[next(iter(episodes))]
+    episodes.insert_or_update(url, partial(make_episode, title="New"), on_update)
+    assert [e.title for e in episodes] == ["New"]
+
+    episodes.insert_or_update_many(
+        ["Many", "Many"],
+        episode_url=lambda title: url,
+        on_insert=lambda url, title: make_episode(url, title),
+        on_update=lambda e, title: make_episode(url, f"{e.title} {title}"),
+    )
+    assert [e.title for e in episodes] == ["New Many Many"]
@@ -0,0 +1,45 @@
+from mp3 import id3v2_size, length
+
+# MPEG 1 Layer III, 128 kbps, 44.1 kHz, joint stereo: 417 byte frames
+_FRAME_HEADER = b"\xff\xfb\x90\x44"
+_FRAME_SIZE = 417
+
+
+def _frame(payload: bytes = b"") -> bytes:
+    body = bytes(32) + payload
+    return _FRAME_HEADER + body + bytes(_FRAME_SIZE - 4 - len(body))
+
+
+def test_id3v2_size() -> None:
+    assert id3v2_size(b"") == 0
+    assert id3v2_size(_frame()) == 0
+    assert id3v2_size(b"ID3\x04\x00\x00\x00\x00\x02\x01" + bytes(257)) == 267
+    assert id3v2_size(b"ID3\x04\x00\x10\x00\x00\x00\x0a") == 30
+
+
+def test_length_xing() -> None:
+    xing = b"Xing" + (1).to_bytes(4, "big") + (1000).to_bytes(4, "big")
+    data = _frame(xing) + _frame()
+    seconds = length(data)
+    assert seconds is not None
+    assert round(seconds, 2) == 26.12
+
+
+def test_length_vbri() -> None:
+    vbri = b"VBRI" + bytes(10) + (2000).to_bytes(4, "big")
+    data = _frame(vbri) + _frame()
+    seconds = length(data)
+    assert seconds is not None
+    assert round(seconds, 2) == 52.24
+
+
+def test_length_cbr() -> None:
+    data = _frame() + _frame()
+    assert length(data) is None
+    assert length(data, audio_size=16_000_000) == 1000.0
+
+
+def test_length_not_mp3() -> None:
+    assert length(b"") is None
+    assert length(b"\x00\x00\x00\x20ftypM4A " + bytes(1024)) is None
+    assert length(_FRAME_HEADER + bytes(1024)) is None
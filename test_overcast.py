@@ -195,5 +195,54 @@ def test_parse_episode_caption_text() -> None:
     assert result.in_progress is None
 
 
+def test_parse_datetime() -> None:
+    server_tzinfo = timezone(-timedelta(hours=5))
+
+    assert overcast._parse_datetime("2014-07-16T16:56:20-04:00") == datetime(
+        2014, 7, 16, 20, 56, 20, tzinfo=timezone.utc
+    )
+    assert overcast._parse_datetime("2014-07-16T16:56:20Z") == datetime(
+        2014, 7, 16, 16, 56, 20, tzinfo=timezone.utc
+    )
+    assert overcast._parse_datetime("2014-07-16T16:56:20") == datetime(
+        2014, 7, 16, 16, 56, 20, tzinfo=server_tzinfo
+    )
+    assert overcast._parse_datetime("Wed, 16 Jul 2014 16:56:20 -0400") == datetime(
+        2014, 7, 16, 20, 56, 20, tzinfo=timezone.utc
+    )
+
+
+def test_overcast_feed_url() -> None:
+    url = OvercastFeedURL("https://overcast.fm/p12345-AbCdEf")
+    assert url == "https://overcast.fm/p12345-AbCdEf"
+    OvercastFeedURL("https://overcast.fm/itunes528458508/the-talk-show")
+
+    with pytest.raises(ValueError):
+        OvercastFeedURL("https://overcast.fm/+B7NAFKiP8")
+    with pytest.raises(ValueError):
+        OvercastFeedURL("http://overcast.fm/p12345-AbCdEf")
+    with pytest.raises(ValueError):
+        OvercastFeedURL("https://example.com/p12345-AbCdEf")
+
+
+def test_overcast_episode_url() -> None:
+    url = OvercastEpisodeURL("https://overcast.fm/+B7NAFKiP8")
+    assert url == "https://overcast.fm/+B7NAFKiP8"
+    OvercastEpisodeURL("https://overcast.fm/+B7NAFKiP8?t=10")
+
+    with pytest.raises(ValueError):
+        OvercastEpisodeURL("https://overcast.fm/p12345-AbCdEf")
+    with pytest.raises(ValueError):
+        OvercastEpisodeURL("https://example.com/+B7NAFKiP8")
+
+
+def test_extract_feed_id_from_art_url() -> None:
+    url = overcast.OvercastCDNURL("https://public.overcast-cdn.com/art/126160?v198")
+    assert overcast._extract_feed_id_from_art_url(url) == 126160
+
+    url = overcast.OvercastCDNURL("https://public.overcast-cdn.com/art/555")
+    assert overcast._extract_feed_id_from_art_url(url) == 555
+
+
 def test_session_purge_cache(overcast_session: Session) -> None:
     overcast_session.requests_session.purge_cache(older_than=timedelta(days=30))
@@ -64,6 +64,39 @@ def test_get_httpbin_inject_expires_response_header(session: Session) -> None:
     assert session.is_cache_fresh(request)
 
 
+def test_get_httpbin_etag_revalidate(session: Session) -> None:
+    for i in range(2):
+        res, from_cache = session.get(
+            "/etag/overcast-data",
+            request_accept="application/json",
+        )
+
+        assert res.status_code == 200
+        assert res.headers["ETag"] == "overcast-data"
+        assert res.json()["url"] == "https://httpbin.org/etag/overcast-data"
+
+        if i > 0:
+            assert from_cache is True
+
+
+def test_get_httpbin_not_found_cached(session: Session) -> None:
+    for i in range(2):
+        with pytest.raises(requests.HTTPError) as excinfo:
+            session.get(
+                "/status/404",
+                request_accept="application/json",
+                not_found_expires_in=timedelta(days=30),
+            )
+        assert excinfo.value.response.status_code == 404
+
+    request = requests.Request(
+        "GET",
+        "https://httpbin.org/status/404",
+        headers={"Accept": "application/json"},
+    )
+    assert session.is_cache_fresh(request)
+
+
 def test_response_bytes_roundtrip() -> None:
     response_bytes = b"HTTP/1.1 200 OK\nContent-Type: text/plain\n\nHello, World!"
 
@@ -75,6 +108,35 @@ def test_response_bytes_roundtrip() -> None:
     assert response_to_bytes(response) == response_bytes
 
 
+def test_response_bytes_roundtrip_preserves_body() -> None:
+    response_bytes = (
+        b"HTTP/1.1 200 OK\nContent-Type: text/plain\n\nHello,\r\n\nWorld!\n"
+    )
+
+    response = bytes_to_response(response_bytes)
+    assert response.content == b"Hello,\r\n\nWorld!\n"
+
+    assert response_to_bytes(response) == response_bytes
+
+
+def test_cached_response_head(tmp_path: Path) -> None:
+    session = Session(cache_dir=tmp_path, base_url="https://httpbin.org")
+    request = requests.Request("GET", "https://httpbin.org/get")
+    assert session.cached_response_head(request) is None
+
+    path = session.cache_path(request)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(
+        b"HTTP/1.1 200 OK\nDate: Mon, 01 Jan 2024 00:00:00 GMT\n\nHello,\n\nWorld!"
+    )
+
+    response = session.cached_response_head(request)
+    assert response
+    assert response.status_code == 200
+    assert response.headers["Date"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert response.content == b""
+
+
 def test_cache_entries(session: Session) -> None:
     session.get(
         "/get",